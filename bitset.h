@@ -1,6 +1,10 @@
 #ifndef _SOKOSOLVE_BITSET_H
 #define _SOKOSOLVE_BITSET_H
 
+#ifdef _MSC_VER
+#include <intrin.h>
+#endif
+
 // A bitset is an array of bits_t which was can manipulate on bit level
 // The bistset size is multiples of 64-bit unsigned integers
 typedef unsigned long long bits_t;
@@ -9,6 +13,24 @@ typedef unsigned short pos_t;
 // BITS_CNT presents the number of bits in bits_t (which should be 64)
 #define BITS_CNT (sizeof(bits_t)*8)
 
+// Returns the index of the lowest set bit in "bits"
+// "bits" must not be 0
+inline pos_t lowest_bit(bits_t bits){
+#if defined(_MSC_VER) && defined(_WIN64)
+    unsigned long index;
+    _BitScanForward64(&index, bits);
+    return (pos_t)index;
+#elif defined(_MSC_VER)
+    // _BitScanForward64 is only available on 64-bit targets, so we scan the low then the high 32 bits
+    unsigned long index;
+    if(_BitScanForward(&index, (unsigned long)bits)) return (pos_t)index;
+    _BitScanForward(&index, (unsigned long)(bits >> 32));
+    return (pos_t)(index + 32);
+#else
+    return (pos_t)__builtin_ctzll(bits);
+#endif
+}
+
 // Set the bit in "bitset" at position "pos" to 1
 inline void set_bit(bits_t* bitset, pos_t pos){
     bitset[pos / BITS_CNT] |= (bits_t)(1) << (pos % BITS_CNT);
@@ -72,6 +94,33 @@ inline void bitset_xor(bits_t* first, bits_t* second, size_t size, bits_t* resul
     }
 }
 
+// Constants and rotation used by "bitset_hash" (taken from XXH64)
+#define BITSET_HASH_PRIME1 0x9E3779B185EBCA87ULL
+#define BITSET_HASH_PRIME2 0xC2B2AE3D27D4EB4FULL
+#define BITSET_HASH_PRIME3 0x165667B19E3779F9ULL
+#define BITSET_HASH_PRIME4 0x85EBCA77C2B2AE63ULL
+#define BITSET_HASH_PRIME5 0x27D4EB2F165667C5ULL
+#define BITSET_HASH_ROTL(x, r) (((x) << (r)) | ((x) >> (64 - (r))))
+
+// Hash the bitset using the 8-byte lane rounds and the final avalanche of XXH64
+// Since the bitset is always a multiple of 8 bytes, the generic byte-stream handling is not needed
+// Size is the number of bits_t in the bitset
+inline bits_t bitset_hash(bits_t* bitset, size_t size, bits_t seed){
+    bits_t hash = seed + BITSET_HASH_PRIME5 + (bits_t)(size * sizeof(bits_t));
+    for(size_t index = 0; index < size; ++index){
+        bits_t lane = bitset[index] * BITSET_HASH_PRIME2;
+        lane = BITSET_HASH_ROTL(lane, 31) * BITSET_HASH_PRIME1;
+        hash ^= lane;
+        hash = BITSET_HASH_ROTL(hash, 27) * BITSET_HASH_PRIME1 + BITSET_HASH_PRIME4;
+    }
+    hash ^= hash >> 33;
+    hash *= BITSET_HASH_PRIME2;
+    hash ^= hash >> 29;
+    hash *= BITSET_HASH_PRIME3;
+    hash ^= hash >> 32;
+    return hash;
+}
+
 // Copy the content of "src" into "dst"
 // Size is the number of bits_t in the bitset
 inline void bitset_copy(bits_t* src, bits_t* dest, size_t size){
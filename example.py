@@ -36,6 +36,7 @@ level = \
 #   -   There is one and only one player.
 #   -   The number of crates are equal to the number of goals.
 #   -   At least one crate is not on a goal.
+# To know which condition is violated, use 'solver.parse_level_status(level)' instead
 
 valid = solver.parse_level(level)
 
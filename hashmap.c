@@ -281,9 +281,13 @@ void *hashmap_get(struct hashmap *map, void *key) {
     }
     uint64_t hash = get_hash(map, key);
 	size_t i = hash & map->mask;
+    // With robinhood hashing, a bucket whose entry is closer to its home
+    // bucket than the probe distance means that the key is not in the map, so
+    // misses stop there instead of scanning to the next empty bucket.
+    uint64_t dib = 1;
 	for (;;) {
         struct bucket *bucket = bucket_at(map, i);
-		if (!bucket->dib) {
+		if (bucket->dib < dib) {
 			return NULL;
 		}
 		if (bucket->hash == hash && 
@@ -292,6 +296,60 @@ void *hashmap_get(struct hashmap *map, void *key) {
             return bucket_item(bucket);
 		}
 		i = (i + 1) & map->mask;
+        dib++;
+	}
+}
+
+// hashmap_get_or_set returns the item based on the provided key if it is
+// already in the hash map. Otherwise, the item is inserted and NULL is
+// returned. This is equivalent to a hashmap_get followed by a hashmap_set
+// when the item is missing, but only walks the probe sequence once. This
+// operation may allocate memory. If the system is unable to allocate
+// additional memory then NULL is returned and hashmap_oom() returns true.
+void *hashmap_get_or_set(struct hashmap *map, void *item) {
+    if (!item) {
+        panic("item is null");
+    }
+    map->oom = false;
+    if (map->count == map->growat) {
+        if (!resize(map, map->nbuckets*2)) {
+            map->oom = true;
+            return NULL;
+        }
+    }
+
+    struct bucket *entry = map->edata;
+    entry->hash = get_hash(map, item);
+    entry->dib = 1;
+    memcpy(bucket_item(entry), item, map->elsize);
+
+    // Once the item has been placed, the entries it displaces are already
+    // unique so they don't need to be compared.
+    bool inserted = false;
+    size_t i = entry->hash & map->mask;
+	for (;;) {
+        struct bucket *bucket = bucket_at(map, i);
+        if (bucket->dib == 0) {
+            memcpy(bucket, entry, map->bucketsz);
+            map->count++;
+			return NULL;
+		}
+        if (!inserted && entry->hash == bucket->hash && 
+            map->compare(bucket_item(entry), bucket_item(bucket), 
+                         map->udata) == 0)
+        {
+            return bucket_item(bucket);
+		}
+        if (bucket->dib < entry->dib) {
+            // With robinhood hashing, the item cannot be further along the
+            // probe sequence, so it takes this bucket.
+            memcpy(map->spare, bucket, map->bucketsz);
+            memcpy(bucket, entry, map->bucketsz);
+            memcpy(entry, map->spare, map->bucketsz);
+            inserted = true;
+		}
+		i = (i + 1) & map->mask;
+        entry->dib += 1;
 	}
 }
 
@@ -317,9 +375,10 @@ void *hashmap_delete(struct hashmap *map, void *key) {
     map->oom = false;
     uint64_t hash = get_hash(map, key);
 	size_t i = hash & map->mask;
+    uint64_t dib = 1;
 	for (;;) {
         struct bucket *bucket = bucket_at(map, i);
-		if (!bucket->dib) {
+		if (bucket->dib < dib) {
 			return NULL;
 		}
 		if (bucket->hash == hash && 
@@ -348,6 +407,7 @@ void *hashmap_delete(struct hashmap *map, void *key) {
 			return map->spare;
 		}
 		i = (i + 1) & map->mask;
+        dib++;
 	}
 }
 
@@ -35,6 +35,7 @@ size_t hashmap_count(struct hashmap *map);
 bool hashmap_oom(struct hashmap *map);
 void *hashmap_get(struct hashmap *map, void *item);
 void *hashmap_set(struct hashmap *map, void *item);
+void *hashmap_get_or_set(struct hashmap *map, void *item);
 void *hashmap_delete(struct hashmap *map, void *item);
 void *hashmap_probe(struct hashmap *map, uint64_t position);
 bool hashmap_scan(struct hashmap *map,
@@ -1 +1 @@
-from .sokosolve import SokobanSolver
\ No newline at end of file
+from .sokosolve import SokobanSolver, ParseStatus
\ No newline at end of file
@@ -1,3 +1,5 @@
+import os
+import sys
 import cffi
 
 ffibuilder = cffi.FFI()
@@ -8,9 +10,17 @@ typedef char action_t;
 struct context_t;
 struct problem_t;
 
+typedef enum {
+    PARSE_OK = 0,
+    PARSE_INVALID_PLAYER_COUNT = 1,
+    PARSE_CRATE_GOAL_MISMATCH = 2,
+    PARSE_ALL_CRATES_ON_GOALS = 3
+} parse_status_t;
+
 typedef struct {
     bool solved;
     action_t* actions;
+    size_t actions_len;
     size_t iterations;
     bool limit_exceeded;
 } result_t;
@@ -18,15 +28,18 @@ typedef struct {
 
 struct context_t* create_context(unsigned char width, unsigned char height, size_t capacity);
 void free_context(struct context_t* context);
+void reset_context(struct context_t* context);
 
 struct problem_t* allocate_problem(struct context_t* context);
 bool parse_problem(struct context_t* context, struct problem_t* problem, const char* level_str);
+parse_status_t parse_problem_status(struct context_t* context, struct problem_t* problem, const char* level_str);
 void free_problem(struct problem_t* problem);
 
 
 result_t solve_bfs(struct context_t* context, struct problem_t* problem, size_t max_iterations);
 result_t solve_astar(struct context_t* context, struct problem_t* problem, float h_factor, float g_factor, size_t max_iterations);
 void free_result(result_t result);
+void free_actions(action_t* actions);
 """
 
 standard_headers = """
@@ -36,6 +49,15 @@ standard_headers = """
 
 ffibuilder.cdef(interface_definition)
 
+# Make sure the solver is built with full optimization regardless of the flags Python was built with
+if sys.platform == "win32":
+    extra_compile_args = ["/O2"]
+else:
+    extra_compile_args = ["-O3"]
+    # Code generation for the build machine's CPU is opt-in since the resulting binary may not run on other machines
+    if os.environ.get("SOKOSOLVE_NATIVE") == "1":
+        extra_compile_args.append("-march=native")
+
 ffibuilder.set_source("_sokosolve", """
 #ifndef SOKOBAN_SOLVER_H
 #define SOKOBAN_SOLVER_H
@@ -45,7 +67,8 @@ ffibuilder.set_source("_sokosolve", """
 {interface}
 
 #endif
-""".format(headers=standard_headers, interface=interface_definition), sources=['solver.c', 'hashmap.c'])
+""".format(headers=standard_headers, interface=interface_definition), sources=['solver.c', 'hashmap.c'],
+    extra_compile_args=extra_compile_args)
 
 if __name__ == "__main__":
     ffibuilder.compile(verbose=True)
\ No newline at end of file
@@ -14,9 +14,26 @@ Example:
 
 """
 
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple, Union
 from _sokosolve import ffi, lib
 from dataclasses import dataclass
+from enum import Enum
+
+# Bind the C functions once so the wrappers below skip the attribute lookups on "lib" in every call
+_create_context = lib.create_context
+_free_context = lib.free_context
+_reset_context = lib.reset_context
+_allocate_problem = lib.allocate_problem
+_parse_problem = lib.parse_problem
+_parse_problem_status = lib.parse_problem_status
+_free_problem = lib.free_problem
+_solve_bfs = lib.solve_bfs
+_solve_astar = lib.solve_astar
+_free_result = lib.free_result
+_free_actions = lib.free_actions
+_ffi_memmove = ffi.memmove
+_ffi_buffer = ffi.buffer
+_ffi_gc = ffi.gc
 
 @dataclass
 class Result:
@@ -27,36 +44,117 @@ class Result:
     ----------
     solved: bool
         Was the solver able to solve the problem?
-    actions: Optional[str]
-        A string of actions containing the solution (or None if no solution was found).
+    actions: Optional[Union[bytes, memoryview]]
+        An ASCII bytes object of actions containing the solution (or None if no solution was found).
         Each character represents an action which can be:
-        'r', 'l', 'u', 'd' for moves without pushing a crate and 'R', 'L', 'U', 'D' for moves while pushing a crate.
+        b'r', b'l', b'u', b'd' for moves without pushing a crate and b'R', b'L', b'U', b'D' for moves while pushing a crate.
+        If the solver was called with copy=False, this is a memoryview over the solution buffer of the C solver instead.
+        Use actions.decode('ascii') (or bytes(actions).decode('ascii') for a memoryview) to get a str.
     iterations: int
         The number of iterations (expanded nodes) before the solver returned. 
     limit_exceeded: bool
         Has the solver failed due to exceeding the limits (the number of iterations or memory capacity)?
     """
+    __slots__ = ("solved", "actions", "iterations", "limit_exceeded")
+
     solved: bool
-    actions: Optional[str] 
+    actions: Optional[Union[bytes, memoryview]]
     iterations: int
     limit_exceeded: bool
 
 
+class ParseStatus(Enum):
+    """The status returned by 'SokobanSolver.parse_level_status'
+
+    OK means that the level is compilable.
+    Otherwise, it tells which compilability condition the level violates.
+    """
+    OK = lib.PARSE_OK
+    INVALID_PLAYER_COUNT = lib.PARSE_INVALID_PLAYER_COUNT
+    CRATE_GOAL_MISMATCH = lib.PARSE_CRATE_GOAL_MISMATCH
+    ALL_CRATES_ON_GOALS = lib.PARSE_ALL_CRATES_ON_GOALS
+
+# The statuses indexed by their C codes (cheaper than calling ParseStatus(code))
+_PARSE_STATUSES = tuple(sorted(ParseStatus, key=lambda status: status.value))
+
+
+def _to_result(_result, copy: bool) -> Result:
+    """Convert a search result returned by the C solver into a Result and release the memory it owns
+
+    Parameters
+    ----------
+    _result : result_t
+        The search result returned by the C solver
+    copy : bool
+        If True, the actions are copied into a bytes object. Otherwise, they are returned as a memoryview
+        over the C buffer which is freed once the view is garbage collected.
+
+    Returns
+    -------
+    Result
+        The search result
+    """
+    if _result.solved and not copy:
+        actions = memoryview(_ffi_buffer(_ffi_gc(_result.actions, _free_actions), _result.actions_len))
+    else:
+        # The solver reports the solution length, so we copy exactly that many bytes instead of scanning for the null terminator
+        actions = _ffi_buffer(_result.actions, _result.actions_len)[:] if _result.solved else None
+        _free_result(_result)
+    return Result(_result.solved, actions, _result.iterations, _result.limit_exceeded)
+
+def _to_tuple(_result) -> Tuple[bool, Optional[bytes], int, bool]:
+    """Convert a search result returned by the C solver into a tuple and release the memory it owns
+
+    Parameters
+    ----------
+    _result : result_t
+        The search result returned by the C solver
+
+    Returns
+    -------
+    Tuple[bool, Optional[bytes], int, bool]
+        The search result as (solved, actions, iterations, limit_exceeded)
+    """
+    solved = _result.solved
+    actions = _ffi_buffer(_result.actions, _result.actions_len)[:] if solved else None
+    _free_result(_result)
+    return (solved, actions, _result.iterations, _result.limit_exceeded)
+
 
 class SokobanSolver:
     """A Solver for sokoban levels
 
+    Each solver owns its pre-allocated memory and the C solver has no shared global state.
+    CFFI releases the GIL while the C functions run, so multiple solvers can search in parallel
+    from different threads (e.g. one solver per worker of a ThreadPoolExecutor).
+    A single solver must not be used from multiple threads at the same time.
+
     ...
     Methods
     -------
+    reset() -> None
+        Clear the states left by the last search while keeping the pre-allocated memory.
+    
     parse_level(level_str: str)  -> bool
         Parses a level to be later solved by either 'solve_bfs' or 'solve_astar'.
     
-    solve_bfs(max_iterations: int = 0) -> Result
+    parse_level_status(level_str: str)  -> ParseStatus
+        The same as 'parse_level' but it returns why the level is not compilable.
+    
+    solve_bfs(max_iterations: int = 0, copy: bool = True) -> Result
         Attempt to solve the level using Breadth First Search.
     
-    solve_astar(h_factor: float = 1, g_factor: float = 1, max_iterations: int = 0) -> Result
+    solve_astar(h_factor: float = 1, g_factor: float = 1, max_iterations: int = 0, copy: bool = True) -> Result
         Attempt to solve the level using A* Search.
+    
+    solve_bfs_tuple(max_iterations: int = 0) -> Tuple[bool, Optional[bytes], int, bool]
+        The same as 'solve_bfs' but it returns a plain tuple (solved, actions, iterations, limit_exceeded).
+    
+    solve_astar_tuple(h_factor: float = 1, g_factor: float = 1, max_iterations: int = 0) -> Tuple[bool, Optional[bytes], int, bool]
+        The same as 'solve_astar' but it returns a plain tuple (solved, actions, iterations, limit_exceeded).
+    
+    solve_many(levels: Iterable[str], use_astar: bool = True, h_factor: float = 1, g_factor: float = 1, max_iterations: int = 0, copy: bool = True) -> List[Optional[Result]]
+        Parse and solve a batch of levels one after the other.
     """
 
     def __init__(self, width: int, height: int, capacity: int) -> None:
@@ -71,16 +169,41 @@ class SokobanSolver:
         capacity : int
             The maximum number of states that the solver can generate
         """
-        self.__context = lib.create_context(width, height, capacity)
+        # Keep the functions used by __del__ on the instance since the module globals may already be cleared during interpreter shutdown
+        self.__free_problem = _free_problem
+        self.__free_context = _free_context
+        self.__context = _create_context(width, height, capacity)
         if self.__context == ffi.NULL: raise MemoryError("Failed to allocate context")
-        self.__problem = lib.allocate_problem(self.__context)
-        if self.__context == ffi.NULL: raise MemoryError("Failed to allocate problem")
+        self.__problem = _allocate_problem(self.__context)
+        if self.__problem == ffi.NULL: raise MemoryError("Failed to allocate problem")
+        # A reusable buffer to pass level strings to the C side without allocating a new one on every parse.
+        # It fits a full level including the wall border and the null terminator, and grows if a longer string is given.
+        self.__level_buf_size = (width + 2) * (height + 2) + 1
+        self.__level_buf = ffi.new(f"char[{self.__level_buf_size}]")
     
     def __del__(self):
         """Delete the solver
+
+        This is safe to call if '__init__' failed part way (e.g. if the context allocation failed).
+        """
+        # The attributes are missing if '__init__' did not reach them (the C functions accept NULL pointers)
+        problem = getattr(self, "_SokobanSolver__problem", None)
+        if problem is not None:
+            self.__problem = None
+            self.__free_problem(problem)
+        context = getattr(self, "_SokobanSolver__context", None)
+        if context is not None:
+            self.__context = None
+            self.__free_context(context)
+    
+    def reset(self) -> None:
+        """Clear the states left by the last search while keeping the pre-allocated memory
+
+        The solver can be reused for any number of levels (of the same size) without being recreated.
+        Each search clears the previous search data on its own, so calling this is only needed to pay
+        the clearing cost ahead of the next search (e.g. outside of a timed region).
         """
-        lib.free_problem(self.__problem)
-        lib.free_context(self.__context)
+        _reset_context(self.__context)
     
     def parse_level(self, level_str: str) -> bool:
         """Parses a level to be later solved by either 'solve_bfs' or 'solve_astar'
@@ -109,10 +232,38 @@ class SokobanSolver:
                 - The number of crates are equal to the number of goals.
                 - At least one crate is not on a goal. 
         """
-        arg = ffi.new("char[]", level_str.encode("utf-8"))
-        return lib.parse_problem(self.__context, self.__problem, arg)
+        return _parse_problem(self.__context, self.__problem, self.__copy_level(level_str))
     
-    def solve_bfs(self, max_iterations: int = 0) -> Result:
+    def parse_level_status(self, level_str: str) -> ParseStatus:
+        """The same as 'parse_level' but it returns why the level is not compilable
+
+        Parameters
+        ----------
+        level_str : str
+            A string containing the level tiles row by row (see 'parse_level' for the format).
+
+        Returns
+        -------
+        ParseStatus
+            ParseStatus.OK if the level is compilable (see 'parse_level' for the conditions).
+            Otherwise, the status of the first violated condition:
+                INVALID_PLAYER_COUNT, CRATE_GOAL_MISMATCH or ALL_CRATES_ON_GOALS.
+        """
+        return _PARSE_STATUSES[_parse_problem_status(self.__context, self.__problem, self.__copy_level(level_str))]
+    
+    def __copy_level(self, level_str: str):
+        """Copy a level string into the reusable level buffer (growing it if needed) and return the buffer
+        """
+        encoded = level_str.encode("utf-8")
+        length = len(encoded)
+        if length >= self.__level_buf_size:
+            self.__level_buf_size = length + 1
+            self.__level_buf = ffi.new(f"char[{self.__level_buf_size}]")
+        _ffi_memmove(self.__level_buf, encoded, length)
+        self.__level_buf[length] = b"\x00"
+        return self.__level_buf
+    
+    def solve_bfs(self, max_iterations: int = 0, copy: bool = True) -> Result:
         """Attempt to solve the level using Breadth First Search
 
         Parameters
@@ -120,18 +271,19 @@ class SokobanSolver:
         max_iterations : int, optional
             The maximum number of nodes to be expanded. If 0, the solver can expand any number of nodes 
             as long as it does not generate more nodes than the solver capacity, by default 0
+        copy : bool, optional
+            If True, the actions are copied into a bytes object. Otherwise, they are returned as a memoryview
+            over the solver's solution buffer (which avoids the copy for long solutions), by default True
 
         Returns
         -------
         Result
             The search result
         """
-        _result = lib.solve_bfs(self.__context, self.__problem, max_iterations)
-        actions = ffi.string(_result.actions) if _result.solved else None
-        lib.free_result(_result)
-        return Result(_result.solved, actions, _result.iterations, _result.limit_exceeded)
+        _result = _solve_bfs(self.__context, self.__problem, max_iterations)
+        return _to_result(_result, copy)
     
-    def solve_astar(self, h_factor: float = 1, g_factor: float = 1, max_iterations: int = 0) -> Result:
+    def solve_astar(self, h_factor: float = 1, g_factor: float = 1, max_iterations: int = 0, copy: bool = True) -> Result:
         """Attempt to solve the level using A* Search.
 
         If h_factor = 0 & g_factor = 1, the solver will run Uniform Cost Search.
@@ -149,13 +301,93 @@ class SokobanSolver:
         max_iterations : int, optional
             The maximum number of nodes to be expanded. If 0, the solver can expand any number of nodes 
             as long as it does not generate more nodes than the solver capacity, by default 0
+        copy : bool, optional
+            If True, the actions are copied into a bytes object. Otherwise, they are returned as a memoryview
+            over the solver's solution buffer (which avoids the copy for long solutions), by default True
 
         Returns
         -------
         Result
             The search result
         """
-        _result = lib.solve_astar(self.__context, self.__problem, h_factor, g_factor, max_iterations)
-        actions = ffi.string(_result.actions) if _result.solved else None
-        lib.free_result(_result)
-        return Result(_result.solved, actions, _result.iterations, _result.limit_exceeded)
+        _result = _solve_astar(self.__context, self.__problem, h_factor, g_factor, max_iterations)
+        return _to_result(_result, copy)
+    
+    def solve_bfs_tuple(self, max_iterations: int = 0) -> Tuple[bool, Optional[bytes], int, bool]:
+        """The same as 'solve_bfs' but it returns a plain tuple instead of a Result (which is cheaper to create).
+
+        Parameters
+        ----------
+        max_iterations : int, optional
+            The maximum number of nodes to be expanded (see 'solve_bfs'), by default 0
+
+        Returns
+        -------
+        Tuple[bool, Optional[bytes], int, bool]
+            The search result as (solved, actions, iterations, limit_exceeded)
+        """
+        return _to_tuple(_solve_bfs(self.__context, self.__problem, max_iterations))
+    
+    def solve_astar_tuple(self, h_factor: float = 1, g_factor: float = 1, max_iterations: int = 0) -> Tuple[bool, Optional[bytes], int, bool]:
+        """The same as 'solve_astar' but it returns a plain tuple instead of a Result (which is cheaper to create).
+
+        Parameters
+        ----------
+        h_factor : float, optional
+            The weight of the heuristic function in the node priority (see 'solve_astar'), by default 1
+        g_factor : float, optional
+            The weight of the path cost in the node priority (see 'solve_astar'), by default 1
+        max_iterations : int, optional
+            The maximum number of nodes to be expanded (see 'solve_astar'), by default 0
+
+        Returns
+        -------
+        Tuple[bool, Optional[bytes], int, bool]
+            The search result as (solved, actions, iterations, limit_exceeded)
+        """
+        return _to_tuple(_solve_astar(self.__context, self.__problem, h_factor, g_factor, max_iterations))
+
+    
+    def solve_many(self, levels: Iterable[str], use_astar: bool = True, h_factor: float = 1, g_factor: float = 1, max_iterations: int = 0, copy: bool = True) -> List[Optional[Result]]:
+        """Parse and solve a batch of levels one after the other.
+
+        Every level is parsed into the same problem and solved with the same context,
+        so the context and problem are reused instead of being reallocated per level.
+        CFFI releases the GIL during each call into the solver, so separate solvers can
+        run batches on separate threads.
+        After this function returns, the solver holds the last level in the batch.
+
+        Parameters
+        ----------
+        levels : Iterable[str]
+            The level strings (see 'parse_level' for the format)
+        use_astar : bool, optional
+            If True, the levels are solved using 'solve_astar', otherwise they are solved using 'solve_bfs', by default True
+        h_factor : float, optional
+            The weight of the heuristic function in the node priority (ignored by BFS), by default 1
+        g_factor : float, optional
+            The weight of the path cost in the node priority (ignored by BFS), by default 1
+        max_iterations : int, optional
+            The maximum number of nodes to be expanded for each level, by default 0
+        copy : bool, optional
+            If True, the actions are copied into bytes objects, otherwise they are returned as memoryviews, by default True
+
+        Returns
+        -------
+        List[Optional[Result]]
+            The search result for each level in order (or None if the level is not valid)
+        """
+        context, problem = self.__context, self.__problem
+        parse_level = self.parse_level
+        results = []
+        append = results.append
+        for level_str in levels:
+            if not parse_level(level_str):
+                append(None)
+                continue
+            if use_astar:
+                _result = _solve_astar(context, problem, h_factor, g_factor, max_iterations)
+            else:
+                _result = _solve_bfs(context, problem, max_iterations)
+            append(_to_result(_result, copy))
+        return results
@@ -16,27 +16,32 @@ int state_compare(const void *a, const void *b, void *udata){
 }
 
 // Hash a state based on the player and crate positions (used by the hashmap)
+// The hashmap is created with seed0 = bitset_stride (the crate bitset size in bytes)
+// The player position is mixed into the seed so that the state is hashed in a single pass over the crate bitset
 uint64_t state_hash(const void *item, uint64_t seed0, uint64_t seed1) {
     const state_t *state = *(state_t**)item;
-    uint64_t player_hash = hashmap_sip(&(state->player), sizeof(pos_t), seed0, seed1);
-    uint64_t crates_hash = hashmap_sip(state->crates, seed0, seed0, seed1);
-    return player_hash ^ (crates_hash << 1);
+    return bitset_hash(state->crates, seed0 / sizeof(bits_t), seed1 + state->player);
 }
 
+// The number of children for each node in the A* frontier heap.
+// A 4-ary heap is shallower than a binary heap and the children of each node are adjacent in memory,
+// so popping the top of the heap touches fewer cache lines.
+// NOTE: Fibonacci and pairing heaps have better asymptotic decrease-key bounds, but they are node-based
+// (pointer chasing on every operation) and have large constant factors. In Sokoban, decrease-key is rare
+// since every step costs 1, so the frontier is dominated by insert and pop, where an implicit d-ary heap wins in practice.
+// Any replacement should be benchmarked against this heap on large frontiers before being adopted.
+#define HEAP_ARITY 4
+
 // Heapify the heap in a bottom up fashion starting from a certain node index
 // Used for heap insert to bubble up the new node
 // Each node will store an index to its location in the heap that is maintained during the heapify process
-void heapify_bottomup(state_t** min_heap, size_t node_index, size_t size){
-    state_t* last = min_heap[node_index]; // Starting from the current node
+void heapify_bottomup(heap_entry_t* min_heap, size_t node_index, size_t size){
+    heap_entry_t last = min_heap[node_index]; // Starting from the current node
     while(node_index){  // While we are not the root
-        size_t parent_index = node_index >> 1;  // Get the parent index (parent index = node index / 2)
-        state_t* parent = min_heap[parent_index];
-        if(last->priority < parent->priority){  // If the node has more priority (less in value) then the parent, swap them
-            // Update the nodes' indices
-            last->heap_index = (index_t)parent_index;
-            parent->heap_index = (index_t)node_index;
-            // swap the nodes
-            min_heap[parent_index] = last;
+        size_t parent_index = (node_index - 1) / HEAP_ARITY;  // Get the parent index
+        heap_entry_t parent = min_heap[parent_index];
+        if(last.priority < parent.priority){  // If the node has more priority (less in value) then the parent, move the parent down
+            parent.state->heap_index = (index_t)node_index;
             min_heap[node_index] = parent;
             // then go up
             node_index = parent_index;
@@ -44,63 +49,68 @@ void heapify_bottomup(state_t** min_heap, size_t node_index, size_t size){
             break; 
         }
     }
+    // Store the node in the location we stopped at
+    last.state->heap_index = (index_t)node_index;
+    min_heap[node_index] = last;
 }
 
 // Heapify the heap in a top down fashion starting from a certain node index
 // Used for heap pop to bubble down the leaf node that is swapped with the root
 // Each node will store an index to its location in the heap that is maintained during the heapify process
-void heapify_topdown(state_t** min_heap, size_t root_index, size_t size){
-    state_t* root = min_heap[root_index]; // Starting from the given root index
+void heapify_topdown(heap_entry_t* min_heap, size_t root_index, size_t size){
+    heap_entry_t root = min_heap[root_index]; // Starting from the given root index
     for(;;){
-        // Check the 2 childern (if they exist) and pick the one with the maximum priority
-        size_t child1_index = root_index << 1; // index of 1st child = nodex index * 2
-        if(child1_index >= size) break; // If no child exist, we are done
-        size_t min_child_index = child1_index;
-        size_t child2_index = child1_index + 1;  // index of 2nd child = nodex index * 2 + 1
-        if(child2_index < size && min_heap[child2_index]->priority < min_heap[child1_index]->priority){ // Only compare 2 children if the 2nd child exist
-            min_child_index = child2_index;
+        // Check the children (if they exist) and pick the one with the maximum priority
+        size_t first_child_index = root_index * HEAP_ARITY + 1;
+        if(first_child_index >= size) break; // If no child exist, we are done
+        size_t end_child_index = first_child_index + HEAP_ARITY;
+        if(end_child_index > size) end_child_index = size; // Only compare the children that exist
+        size_t min_child_index = first_child_index;
+        float min_priority = min_heap[first_child_index].priority;
+        for(size_t child_index = first_child_index + 1; child_index < end_child_index; ++child_index){
+            float priority = min_heap[child_index].priority;
+            if(priority < min_priority){
+                min_priority = priority;
+                min_child_index = child_index;
+            }
         }
-        state_t* child = min_heap[min_child_index];
-        if(child->priority < root->priority){ // If the picked child has more priority than its parent, we swap them
-            // Update the nodes' indices
-            child->heap_index = (index_t)root_index;
-            root->heap_index = (index_t)min_child_index;
-            // swap the nodes
+        if(min_priority < root.priority){ // If the picked child has more priority than its parent, move the child up
+            heap_entry_t child = min_heap[min_child_index];
+            child.state->heap_index = (index_t)root_index;
             min_heap[root_index] = child;
-            min_heap[min_child_index] = root;
             // then go down
             root_index = min_child_index;
         } else { // Otherwise, we are done
             break;
         }
     }
+    // Store the node in the location we stopped at
+    root.state->heap_index = (index_t)root_index;
+    min_heap[root_index] = root;
 }
 
 // Insert a node into the heap.
 // Each node will store an index to its location in the heap that is maintained during the insertion and heapify process
-void heap_insert(state_t** min_heap, state_t* element, size_t *size){
+void heap_insert(heap_entry_t* min_heap, state_t* element, size_t *size){
     // Add the node as the last leaf of the tree
-    size_t index = *size;
-    element->heap_index = (index_t)index;
-    min_heap[index] = element;
-    // If there are more than one node, heapify the heap in a bottom up fashion starting from the new node
-    if(index > 0) heapify_bottomup(min_heap, index, ++(*size));
-    else ++(*size);
+    size_t index = (*size)++;
+    min_heap[index].priority = element->priority;
+    min_heap[index].state = element;
+    // Heapify the heap in a bottom up fashion starting from the new node
+    heapify_bottomup(min_heap, index, *size);
 }
 
 
 // Insert a pop from the top of the heap.
 // Each node will store an index to its location in the heap that is maintained during the pop and heapify process
-state_t* heap_pop(state_t** min_heap, size_t *size){
+state_t* heap_pop(heap_entry_t* min_heap, size_t *size){
+    state_t* root = min_heap[0].state;
     // Get the last leaf
     size_t last_index = --(*size);
     // If the last leaf is also the root, we don't need to do anything other than return it.
-    if(last_index == 0) return min_heap[0];
-    // Otherwise, Swap the root with the last leaf
-    state_t* last = min_heap[last_index];
-    state_t* root = min_heap[0];
-    last->heap_index = 0; // Now the last leaf became the root so its index is 0
-    min_heap[0] = last;
+    if(last_index == 0) return root;
+    // Otherwise, move the last leaf to the root
+    min_heap[0] = min_heap[last_index];
     // Heapify the tree in a top down fashion starting from the new root.
     heapify_topdown(min_heap, 0, last_index);
     return root;
@@ -143,12 +153,18 @@ bool allocate_context_memory(struct context_t* context, bool allocate_heap){
     }
     if(allocate_heap && !context->min_heap){
         // Pre-allocate the frontier for A* search.
-        context->min_heap = (state_t**)malloc(context->state_count * sizeof(state_t*));
+        context->min_heap = (heap_entry_t*)malloc(context->state_count * sizeof(heap_entry_t));
         if(!context->min_heap) return false;
     }
     return true;
 }
 
+// Clear the states stored by the last search while keeping the pre-allocated memory
+// The hashmap is only cleared if it is not empty, since clearing it touches every bucket
+void reset_context(struct context_t* context){
+    if(context->map && hashmap_count(context->map)) hashmap_clear(context->map, false);
+}
+
 // Free the context memory
 void free_context(struct context_t* context){
     if(!context) return;
@@ -419,8 +435,8 @@ char* format_problem(struct context_t* context, struct problem_t* problem, const
 }
 
 // Parse a null-delimited level string and store its data into the problem
-// returns true iff the level is compilable (see problem_t.compilable for more details) 
-bool parse_problem(struct context_t* context, struct problem_t* problem, const char* level_str){
+// returns PARSE_OK iff the level is compilable (see problem_t.compilable for more details), otherwise it returns the reason
+parse_status_t parse_problem_status(struct context_t* context, struct problem_t* problem, const char* level_str){
     memset(problem->walls, ~0, context->bitset_stride); // Initially, every location is considered to contain a wall
                                                         //  to make sure that the border contain walls
     memset(problem->goals, 0, context->bitset_stride);  // Initially, no location is considered to contain a goal
@@ -487,7 +503,11 @@ bool parse_problem(struct context_t* context, struct problem_t* problem, const c
     loop_end:
     problem->goal_count = goal_count;
     // Check that the level is compilable
-    bool valid = player_count == 1 && (goal_count == crate_count) && !bitset_equals(problem->crates, problem->goals, context->bitset_size);
+    parse_status_t status = PARSE_OK;
+    if(player_count != 1) status = PARSE_INVALID_PLAYER_COUNT;
+    else if(goal_count != crate_count) status = PARSE_CRATE_GOAL_MISMATCH;
+    else if(bitset_equals(problem->crates, problem->goals, context->bitset_size)) status = PARSE_ALL_CRATES_ON_GOALS;
+    bool valid = status == PARSE_OK;
     problem->compilable = valid;
     // Check that no 2x2 deadlock patterns exist
     if(valid){
@@ -503,17 +523,24 @@ bool parse_problem(struct context_t* context, struct problem_t* problem, const c
         valid = check_reachability(context, problem->crates, problem->goals, problem->walls, problem->player);
     }
     problem->potentially_solvable = valid;
-    return problem->compilable; // We only return whether the level is compilable or not (regardless of whether it is potentially solvable or not)
+    return status; // We only return whether the level is compilable or not (regardless of whether it is potentially solvable or not)
+}
+
+// Parse a null-delimited level string and store its data into the problem
+// returns true iff the level is compilable (see problem_t.compilable for more details) 
+bool parse_problem(struct context_t* context, struct problem_t* problem, const char* level_str){
+    return parse_problem_status(context, problem, level_str) == PARSE_OK;
 }
 
 // A string of all the action (used to populate the solution)
 const action_t* ACTIONS = "lrduLRDU";
 
 // A utility function to create a result
-inline result_t create_result(bool solved, action_t* actions, size_t iterations, bool limit_exceeded){
+inline result_t create_result(bool solved, action_t* actions, size_t actions_len, size_t iterations, bool limit_exceeded){
     result_t result;
     result.solved = solved;
     result.actions = actions;
+    result.actions_len = actions_len;
     result.iterations = iterations;
     result.limit_exceeded = limit_exceeded;
     return result;
@@ -524,7 +551,7 @@ inline result_t create_result(bool solved, action_t* actions, size_t iterations,
 result_t solve_bfs(struct context_t* context, struct problem_t* problem, size_t max_iterations){
     // If we already know that it is impossible to solve, we return a failure result
     if(!problem->potentially_solvable)
-        return create_result(false, NULL, 0, false);
+        return create_result(false, NULL, 0, 0, false);
 
     // We do not need to check if the problem is already solved
     // since levels where no actions are needed are considered uncompilable
@@ -532,7 +559,7 @@ result_t solve_bfs(struct context_t* context, struct problem_t* problem, size_t
     // Allocate the context memory (if not allocated already) 
     if(!allocate_context_memory(context, false))
         // If the allocation fails, we return a failure result
-        return create_result(false, NULL, 0, true);
+        return create_result(false, NULL, 0, 0, true);
 
     state_t* free_state = context->state_cache; // A pointer in the state cache for the next free state to use
     state_t* free_state_end = free_state + context->state_count; // A pointer to the end of the cache (to know if we consumed all of the cache)
@@ -545,7 +572,7 @@ result_t solve_bfs(struct context_t* context, struct problem_t* problem, size_t
     current->crates = problem->crates;
     current->cost = 0;
 
-    hashmap_clear(context->map, false); // Make sure the hashmap is empty
+    reset_context(context); // Make sure the hashmap is empty
     hashmap_set(context->map, &current); // Add the initial state to the hashmap
 
     // The position offset in all 4 directions
@@ -558,11 +585,14 @@ result_t solve_bfs(struct context_t* context, struct problem_t* problem, size_t
     // So the queue is empty if the pointer to the current state points to the free state
     while(current != free_state){
         // Check if we exceeded the iteration limit
-        if(max_iterations > 0 && iterations >= max_iterations) return create_result(false, 0, iterations, true);
+        if(max_iterations > 0 && iterations >= max_iterations) return create_result(false, 0, 0, iterations, true);
         ++iterations;
         state_t* parent = current++; // Get the next node from the queue and increment the queue pointer.
         cost_t cost = parent->cost + 1; // Compute the child cost (every step costs 1)
         for(unsigned char index=0; index<4; index++){ // For each direction
+            // If the parent was reached by a move without a push, undoing that move leads back to the grandparent which is already in the hashmap.
+            // So we skip it without hashing the child and probing the hashmap (the directions are ordered such that index ^ 1 is the opposite direction)
+            if(parent->parent && parent->action == ACTIONS[index ^ 1]) continue;
             dir_t direction = directions[index];
             pos_t player = parent->player + direction; // Get the new player location
             if(get_bit(problem->walls, player)) continue; // If the new location is in a wall, we skip this action
@@ -598,7 +628,7 @@ result_t solve_bfs(struct context_t* context, struct problem_t* problem, size_t
                     parent = parent->parent;
                 }
                 // Return the success result alongside the solution
-                return create_result(true, solution, iterations, false);
+                return create_result(true, solution, cost, iterations, false);
             }
             // Create a child state
             state_t* child = free_state;
@@ -607,12 +637,11 @@ result_t solve_bfs(struct context_t* context, struct problem_t* problem, size_t
             child->parent = parent;
             child->player = player;
             child->crates = crates;
-            // Check if it already exists
-            if(hashmap_get(context->map, &child) == NULL){ // If it did not already exist
+            // Check if it already exists and add it to the hashmap if it does not (in a single probe)
+            if(hashmap_get_or_set(context->map, &child) == NULL){ // If it did not already exist
                 ++free_state; // Increment the free state pointer (the back of the queue)
-                hashmap_set(context->map, &child); // Add the child to the hashmap
                 if(free_state == free_state_end) { // If we have no more states to use in the cache, we return a failure result 
-                    return create_result(false, 0, iterations, true);
+                    return create_result(false, 0, 0, iterations, true);
                 }
             } else if(changed){ // If the child state already exist, we skip it and if it consumed a new bitset, we return that bitset to the cache
                 free_bits -= context->bitset_size; 
@@ -620,7 +649,7 @@ result_t solve_bfs(struct context_t* context, struct problem_t* problem, size_t
         }
     }
     // If no solution was found, we return a failure result
-    return create_result(false, 0, iterations, false);
+    return create_result(false, 0, 0, iterations, false);
 }
 
 // Compute the heuristic for a state
@@ -628,8 +657,14 @@ inline
 cost_t compute_heuristic(struct context_t* context, struct problem_t* problem, state_t* state){
     cost_t h = 0;
     // For each crate, find the path cost to the nearest goal and add it to the heuristic
-    for(unsigned int position = 0; position < context->area; ++position){
-        if(get_bit(state->crates, position)) h += problem->heuristics[position];
+    // We only visit the set bits in the crate bitset instead of checking every location in the level
+    for(size_t index = 0; index < context->bitset_size; ++index){
+        bits_t bits = state->crates[index];
+        pos_t offset = (pos_t)(index * BITS_CNT);
+        while(bits){
+            h += problem->heuristics[offset + lowest_bit(bits)];
+            bits &= bits - 1; // Clear the lowest set bit
+        }
     }
     return h;
 }
@@ -640,7 +675,7 @@ cost_t compute_heuristic(struct context_t* context, struct problem_t* problem, s
 result_t solve_astar(struct context_t* context, struct problem_t* problem, float h_factor, float g_factor, size_t max_iterations){
     // If we already know that it is impossible to solve, we return a failure result
     if(!problem->potentially_solvable)
-        return create_result(false, NULL, 0, false);
+        return create_result(false, NULL, 0, 0, false);
 
     // We do not need to check if the problem is already solved
     // since levels where no actions are needed are considered uncompilable
@@ -648,7 +683,7 @@ result_t solve_astar(struct context_t* context, struct problem_t* problem, float
     // Allocate the context memory (if not allocated already) 
     if(!allocate_context_memory(context, true))
         // If the allocation fails, we return a failure result
-        return create_result(false, NULL, 0, true);
+        return create_result(false, NULL, 0, 0, true);
     
     state_t* free_state = context->state_cache; // A pointer in the state cache for the next free state to use
     state_t* free_state_end = free_state + context->state_count; // A pointer to the end of the cache (to know if we consumed all of the cache)
@@ -664,7 +699,7 @@ result_t solve_astar(struct context_t* context, struct problem_t* problem, float
     current->heuristic = compute_heuristic(context, problem, current);
     current->priority = h_factor * current->heuristic; // The cost is 0, so we skip computing g_factor * current->cost
 
-    hashmap_clear(context->map, false);  // Make sure the hashmap is empty
+    reset_context(context);  // Make sure the hashmap is empty
     hashmap_set(context->map, &current); // Add the initial state to the hashmap
 
     size_t heap_size = 0; // The current heap size (It is not stored in the context since we don't need to persist outside the search function)
@@ -678,12 +713,15 @@ result_t solve_astar(struct context_t* context, struct problem_t* problem, float
     // While there are more nodes in the heap
     while(heap_size){
         // Check if we exceeded the iteration limit
-        if(max_iterations > 0 && iterations >= max_iterations) return create_result(false, 0, iterations, true);
+        if(max_iterations > 0 && iterations >= max_iterations) return create_result(false, 0, 0, iterations, true);
         ++iterations;
         state_t* parent = heap_pop(context->min_heap, &heap_size); // Get the current node from the heap front
         parent->heap_index = -1; // Set heap index to -1 since it is no longer in the heap
         cost_t cost = parent->cost + 1; // Compute the child cost (every step costs 1)
         for(int index=0; index<4; index++){ // For each direction
+            // If the parent was reached by a move without a push, undoing that move leads back to the grandparent which is already in the hashmap.
+            // So we skip it without hashing the child and probing the hashmap (the directions are ordered such that index ^ 1 is the opposite direction)
+            if(parent->parent && parent->action == ACTIONS[index ^ 1]) continue;
             int direction = directions[index];
             pos_t player = parent->player + direction; // Get the new player location
             if(get_bit(problem->walls, player)) continue; // If the new location is in a wall, we skip this action
@@ -720,7 +758,7 @@ result_t solve_astar(struct context_t* context, struct problem_t* problem, float
                     parent = parent->parent;
                 }
                 // Return the success result alongside the solution
-                return create_result(true, solution, iterations, false);
+                return create_result(true, solution, cost, iterations, false);
             }
             // Create a child state
             state_t* child = free_state;
@@ -729,17 +767,16 @@ result_t solve_astar(struct context_t* context, struct problem_t* problem, float
             child->parent = parent;
             child->player = player;
             child->crates = crates;
-            // Check if it already exists
-            void* search_result = hashmap_get(context->map, &child);
+            // Check if it already exists and add it to the hashmap if it does not (in a single probe)
+            void* search_result = hashmap_get_or_set(context->map, &child);
             if(search_result == NULL){ // If it did not already exist
                 // The heuristic only depends on the crate positions so we only need to recompute it when a crate moves
                 child->heuristic = changed ? compute_heuristic(context, problem, child) : parent->heuristic;
                 child->priority = g_factor * cost + h_factor * child->heuristic;
                 ++free_state;  // Increment the free state pointer (a cached state is consumed)
-                hashmap_set(context->map, &child); // Add the child to the hashmap
                 heap_insert(context->min_heap, child, &heap_size); // Add the child to the heap
                 if(free_state == free_state_end) {  // If we have no more states to use in the cache, we return a failure result
-                    return create_result(false, 0, iterations, true);
+                    return create_result(false, 0, 0, iterations, true);
                 }
             } else {  // If the child state already exist, we skip it
                 //  if the child consumed a new bitset, we return that bitset to the cache
@@ -756,6 +793,7 @@ result_t solve_astar(struct context_t* context, struct problem_t* problem, float
                     twin->cost = child->cost;
                     // Recompute the priority
                     twin->priority = h_factor * twin->heuristic + g_factor * twin->cost;
+                    context->min_heap[twin->heap_index].priority = twin->priority;
                     // Heapify bottomup from the its current index to find its new location in the heap
                     heapify_bottomup(context->min_heap, twin->heap_index, heap_size);
                 } 
@@ -763,10 +801,15 @@ result_t solve_astar(struct context_t* context, struct problem_t* problem, float
         }
     }
     // If no solution was found, we return a failure result
-    return create_result(false, 0, iterations, false);
+    return create_result(false, 0, 0, iterations, false);
 }
 
 // Free the result
 void free_result(result_t result){
-    if(result.actions) free(result.actions);
+    free_actions(result.actions);
+}
+
+// Free the actions of a result
+void free_actions(action_t* actions){
+    if(actions) free(actions);
 }
\ No newline at end of file
@@ -43,10 +43,19 @@ struct context_t;
 // The problem contains the details of the level (wall & goal locations, the initial player & crates locations, etc)
 struct problem_t;
 
+// The status of parsing a level (returned by parse_problem_status)
+typedef enum {
+    PARSE_OK = 0,                       // The level is compilable
+    PARSE_INVALID_PLAYER_COUNT = 1,     // The level does not contain exactly one player
+    PARSE_CRATE_GOAL_MISMATCH = 2,      // The number of crates is not equal to the number of goals
+    PARSE_ALL_CRATES_ON_GOALS = 3       // Every crate is already on a goal (no actions are needed)
+} parse_status_t;
+
 // The solver returns a result structure after it finishes
 typedef struct {
     bool solved; // Was the solver able to solve the problem?
     action_t* actions; // A null-delimited string of actions containing the solution (or null if no solution was found). 
+    size_t actions_len; // The number of actions in the solution (0 if no solution was found).
     size_t iterations; // The number of iterations (expanded nodes) before the solver returned. 
     bool limit_exceeded; // Has the solver failed due to exceeding the limits (the number of iterations or memory capacity)?
 } result_t;
@@ -55,6 +64,9 @@ typedef struct {
 struct context_t* create_context(unsigned char width, unsigned char height, size_t capacity);
 // Free the context. This function does not handle double-free.
 void free_context(struct context_t* context);
+// Clear the states left in the context by the last search without releasing its pre-allocated memory.
+// The search functions do this on their own, so it is only needed to pay the clearing cost ahead of the next search.
+void reset_context(struct context_t* context);
 
 // Allocate memory for a problem (the wall, crate, goal & player locations, data used by the heuristic, etc.)
 struct problem_t* allocate_problem(struct context_t* context);
@@ -79,6 +91,9 @@ struct problem_t* allocate_problem(struct context_t* context);
 //      - At least one crate is not on a goal. 
 // NOTE: you could reuse the problem to parse another level later.
 bool parse_problem(struct context_t* context, struct problem_t* problem, const char* level_str);
+// The same as parse_problem, but it returns why the level is not compilable (or PARSE_OK if it is).
+// If multiple conditions fail, the first one in the list above is returned.
+parse_status_t parse_problem_status(struct context_t* context, struct problem_t* problem, const char* level_str);
 // This will convert the problem to string. The formatted string will automatically add walls around the level.
 // so a level of size WxH will be presented as a (W+2)x(H+2) level with the first and last columns being walls. 
 char* format_problem(struct context_t* context, struct problem_t* problem, const char* separator);
@@ -100,6 +115,9 @@ result_t solve_bfs(struct context_t* context, struct problem_t* problem, size_t
 result_t solve_astar(struct context_t* context, struct problem_t* problem, float h_factor, float g_factor, size_t max_iterations);
 // Free the search result.
 void free_result(result_t result);
+// Free the actions of a search result on their own (e.g. if the actions outlive the result).
+// Do not call free_result on the same result afterwards.
+void free_actions(action_t* actions);
 
 // NOTE: you could run multiple search functions on the same problem and context
 // without needing to reallocate them or the re-parse the level. 
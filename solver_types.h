@@ -20,6 +20,14 @@ typedef struct _state_t {
     bits_t* crates;             // The bitset representing the crate positions in the current state
 } state_t;
 
+// An entry in the A* frontier heap
+// The priority is copied next to the node pointer so that the heap can compare children without dereferencing them.
+// The entry is 16 bytes, so the 4 children of a heap node are stored in 64 contiguous bytes.
+typedef struct {
+    float priority;             // A copy of the node priority (it must be updated alongside the node priority)
+    state_t* state;             // The node stored in this heap entry
+} heap_entry_t;
+
 struct context_t {
     len_t width, height;    // The supported width and height for the levels (it is 2 more than the actual width and height of the level to store a border of walls)
     pos_t area;             // The area of the level (width * height). We cache it since we use it alot.
@@ -29,7 +37,7 @@ struct context_t {
     state_t* state_cache;   // A pre-allocated cache of all the states that we should ever need
     bits_t* bitset_cache;   // A pre-allocated cache of all the bitsets that we should ever need 
     struct hashmap* map;    // A hashmap to store the explored nodes.
-    state_t** min_heap;     // A min-heap to store the frontier for A* search
+    heap_entry_t* min_heap; // A 4-ary min-heap to store the frontier for A* search
 };
 
 struct problem_t {
@@ -16,6 +16,7 @@ typedef struct {
         bool compilable;
         bool solvable;
         cost_t solution_length; // Since solutions may vary, we only test for the optimal solution length
+        int parse_status;       // The expected parse_status_t of an uncompilable level (-1 if we don't care which check failed)
     } expected;
 } test_case_t;
 
@@ -58,7 +59,8 @@ bool run_test_case(int test_case_number, int line_number, test_case_t *test_case
     // Create the context and the problem, then parse the level
     struct context_t* context = create_context(test_case->width, test_case->height, 4 * test_case->solver_config.max_iterations);
     struct problem_t* problem = allocate_problem(context);
-    bool compilable = parse_problem(context, problem, test_case->level);
+    parse_status_t parse_status = parse_problem_status(context, problem, test_case->level);
+    bool compilable = parse_status == PARSE_OK;
 
     if(print_level){
         // Print level (only feasible if it is compilable)
@@ -80,10 +82,16 @@ bool run_test_case(int test_case_number, int line_number, test_case_t *test_case
             (compilable?STR_C:STR_UNC)
         );
         success = false;
+    } else if(!compilable && test_case->expected.parse_status >= 0 && (int)parse_status != test_case->expected.parse_status){
+        // Failure Case: The level is uncompilable but for a different reason than expected
+        printf("TEST %i (Line %i) FAILED: The expected parse status is %i but the solver returned %i\n",
+            test_case_number, line_number, test_case->expected.parse_status, (int)parse_status);
+        success = false;
     }
 
     result_t result = {
         .actions = NULL,
+        .actions_len = 0,
         .solved = false,
         .limit_exceeded = false,
         .iterations =0
@@ -111,6 +119,12 @@ bool run_test_case(int test_case_number, int line_number, test_case_t *test_case
         if(success && result.solved){
 
             solution_length = (cost_t)strnlen_s(result.actions, 1<<(8*sizeof(cost_t)));
+            if(result.actions_len != solution_length){
+                // Failure Case: The reported solution length does not match the action string
+                printf("TEST %i (Line %i) FAILED: The solver reports %zi actions but the action string contains %i actions.\n", 
+                    test_case_number, line_number, result.actions_len, solution_length);
+                success = false;
+            }
             if(test_case->expected.solution_length != 0 && test_case->expected.solution_length != solution_length){
                 // Failure Case: The solution length is not as expected
                 printf("TEST %i (Line %i) FAILED: The expected solution length is %i but the solver's solution requires %i actions.\n", 
@@ -290,6 +304,18 @@ int main(int argc, char const *argv[])
                 test_case.expected.compilable = false;
                 test_case.expected.solvable = false;
                 test_case.expected.solution_length = 0;
+                test_case.expected.parse_status = -1;
+                ++line_ptr;
+                skip_white_spaces(&line_ptr);
+                if(*line_ptr == '('){ // The expected parse status is optional
+                    ++line_ptr;
+                    if(*line_ptr != '_'){
+                        test_case.expected.parse_status = (int)strtol(line_ptr, &line_ptr, 10); // Read the parse status in base 10
+                    } else ++line_ptr;
+                    skip_white_spaces(&line_ptr);
+                    if(*line_ptr != ')') emit_error(line_number, (int)(line_ptr - line), "Invalid Command Format");
+                    ++line_ptr;
+                }
                 break;
             case 'C':
             case 'c':